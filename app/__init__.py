@@ -6,7 +6,7 @@ Este módulo inicializa el paquete y expone los componentes principales.
 # Importar los componentes principales para facilitar su uso
 # Ejemplo:
 from .database import get_session, engine
-from .models import Usuario, Pelicula, Favorito
+from .models import Usuario, Pelicula, Favorito, Genero, PeliculaGenero
 from .config import settings
 
 __version__ = "1.0.0"
@@ -19,6 +19,8 @@ __all__ = [
     "Usuario",
     "Pelicula",
     "Favorito",
+    "Genero",
+    "PeliculaGenero",
     "settings",
     "__version__",
     "__author__"
@@ -3,8 +3,9 @@ Configuración de la aplicación.
 Maneja diferentes entornos: desarrollo, pruebas y producción.
 """
 
+from functools import lru_cache
 from pydantic_settings import BaseSettings
-from typing import Literal, ClassVar
+from typing import Literal, ClassVar, Optional
 from pydantic import field_validator, ConfigDict
 
 class Settings(BaseSettings):
@@ -22,11 +23,23 @@ class Settings(BaseSettings):
     
     
     database_url: str = "sqlite:///./peliculas.db"
+    # Muestra cada consulta SQL en consola; es independiente de debug porque
+    # la escritura es síncrona y ocurre dentro de cada petición
+    sql_echo: bool = False
+
+    # Configuración del pool de conexiones
+    # Con PgBouncer en modo transacción conviene db_pool_pre_ping=False
+    db_pool_size: int = 10
+    db_max_overflow: int = 20
+    db_pool_timeout: int = 30
+    db_pool_recycle: int = 1800  # segundos
+    db_pool_pre_ping: bool = True  # No se aplica a SQLite
     
     # Configuración del servidor
     host: str = "0.0.0.0"
     port: int = 8000
     reload: bool = True # permite recargar automaticamente en desarrollo
+    workers: Optional[int] = None  # procesos fuera de desarrollo; None = uno por CPU
 
     # Configuración de CORS
     # En desarrollo puedes usar ["*"], en producción especifica los orígenes permitidos
@@ -39,8 +52,10 @@ class Settings(BaseSettings):
     
     # Configuración de logging
     log_level: str = "INFO"
-    log_format: str = "%(asctime)s - %(levelname)s - %(message)s - %(message)s"
+    log_format: str = "%(asctime)s - %(levelname)s - %(message)s"
     log_date_format: str = "%Y-%m-%d %H:%M:%S"
+    # Nivel del logger de accesos (una línea por petición), independiente de log_level
+    access_log_level: str = "INFO"
 
     model_config: ClassVar[ConfigDict] = ConfigDict(
         env_file=".env",
@@ -55,10 +70,6 @@ class Settings(BaseSettings):
         return v
 
 
-# Crear una instancia global de Settings
-settings = Settings()
-
-
 # Opcional - Crear diferentes configuraciones para cada entorno
 class DevelopmentSettings(Settings):
     """Configuración para el entorno de desarrollo."""
@@ -89,11 +100,14 @@ class ProductionSettings(Settings):
 
 
 
+@lru_cache(maxsize=1)
 def get_settings() -> Settings:
     """
     Retorna la configuración apropiada según el entorno.
+    Se calcula una sola vez por proceso; las llamadas siguientes
+    reutilizan la misma instancia sin volver a leer el .env.
     """
-    env = settings.environment.lower().strip()
+    env = Settings().environment.lower().strip()
     
     if env == "testing":
         return TestingSettings()
@@ -104,6 +118,10 @@ def get_settings() -> Settings:
 
 
 
+# Instancia global de Settings (la misma que retorna get_settings())
+settings = get_settings()
+
+
 def validate_settings():
     """Valida que todas las configuraciones necesarias estén presentes."""
     required_settings = ["database_url", "app_name"]
@@ -3,20 +3,76 @@ Configuración de la base de datos y gestión de sesiones.
 Utiliza SQLModel para ORM y gestión de conexiones.
 """
 
-from sqlalchemy import text
+import anyio
+from sqlalchemy import event, text
+from sqlalchemy.pool import QueuePool, StaticPool
 from sqlmodel import SQLModel, create_engine, Session, select
-from typing import Generator
-from app.models import Usuario, Pelicula, Favorito
+from typing import AsyncGenerator
+from app.models import Usuario, Pelicula, Favorito, asignar_generos
 from app.config import settings
 
 
+def _engine_options(database_url: str) -> dict:
+    """
+    Retorna los argumentos del pool según el tipo de base de datos.
+    SQLite en memoria usa StaticPool (una única conexión compartida);
+    cualquier otra URL usa un QueuePool dimensionado desde la configuración.
+    Un archivo SQLite local no tiene conexiones caídas, así que no se
+    hace pre-ping al tomar una conexión del pool.
+    """
+    options = {}
+    es_sqlite = database_url.startswith("sqlite")
+    if es_sqlite:
+        options["connect_args"] = {"check_same_thread": False}  # Necesario para SQLite
+        if ":memory:" in database_url or database_url in ("sqlite://", "sqlite:///"):
+            options["poolclass"] = StaticPool
+            return options
+
+    options.update(
+        poolclass=QueuePool,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout,
+        pool_recycle=settings.db_pool_recycle,
+    )
+    if not es_sqlite:
+        options["pool_pre_ping"] = settings.db_pool_pre_ping
+    return options
+
+
 engine = create_engine(
     settings.database_url,
-    echo=settings.debug,  # Muestra las consultas SQL en consola si debug=True
-    connect_args={"check_same_thread": False},  # Necesario para SQLite
+    echo=settings.sql_echo,  # Muestra las consultas SQL en consola si sql_echo=True
+    **_engine_options(settings.database_url),
 )
 
 
+# PRAGMAs de SQLite que se aplican a cada nueva conexión del pool
+SQLITE_PRAGMAS = (
+    "journal_mode=WAL",       # Los lectores no bloquean al escritor
+    "synchronous=NORMAL",     # Seguro en modo WAL y con menos fsync por commit
+    "temp_store=MEMORY",
+    "mmap_size=2147483648",
+    "cache_size=-64000",      # ~64 MB de caché de páginas
+    "busy_timeout=5000",      # Esperar hasta 5s por el bloqueo en vez de fallar
+    "foreign_keys=ON",
+)
+
+
+@event.listens_for(engine, "connect")
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """
+    Configura cada conexión nueva de SQLite con los PRAGMAs de rendimiento.
+    Se ejecuta una sola vez por conexión, no por consulta.
+    """
+    if engine.dialect.name != "sqlite":
+        return
+    cursor = dbapi_connection.cursor()
+    for pragma in SQLITE_PRAGMAS:
+        cursor.execute(f"PRAGMA {pragma}")
+    cursor.close()
+
+
 # Función para crear todas las tablas
 def create_db_and_tables():
     """
@@ -25,6 +81,11 @@ def create_db_and_tables():
     """
 
     SQLModel.metadata.create_all(engine)
+    # create_all no modifica las tablas que ya existen: los índices agregados
+    # después de crearlas se crean aparte para que lleguen a esas bases de datos
+    for table in SQLModel.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(engine, checkfirst=True)
     print("Tablas de la base de datos creadas correctamente")
 
 
@@ -39,19 +100,31 @@ def drop_db_and_tables():
 
 
 # Obtener una sesión de base de datos
-def get_session() -> Generator[Session, None, None]:
+async def get_session() -> AsyncGenerator[Session, None]:
     """
     Generador de sesiones de base de datos.
     Se usa como dependencia en los endpoints de FastAPI.
 
+    Es asíncrono para que FastAPI lo resuelva en el event loop sin pasar
+    por el threadpool: crear la sesión no abre la conexión, esta se toma
+    del pool en la primera consulta, dentro del endpoint. Si la sesión llegó
+    a usar una conexión, cerrarla sí hace I/O (rollback y devolución al pool)
+    y el cierre se ejecuta en un hilo; si no, se cierra directamente.
+
     Uso en endpoints:
         @app.get("/items")
         def read_items(session: Session = Depends(get_session)):
             items = session.exec(select(Item)).all()
             return items
     """
-    with Session(engine) as session:
+    session = Session(engine)
+    try:
         yield session
+    finally:
+        if session.in_transaction():
+            await anyio.to_thread.run_sync(session.close)
+        else:
+            session.close()
 
 
 
@@ -70,6 +143,42 @@ def check_database_connection() -> bool:
         return False
 
 
+def sincronizar_generos():
+    """
+    Llena la tabla PeliculaGenero para las películas que aún no tienen géneros
+    asignados, por ejemplo las cargadas con init_db.sql o antes de que existiera.
+    """
+    with Session(engine) as session:
+        statement = select(Pelicula).where(~Pelicula.generos.any())
+        peliculas = session.exec(statement).all()
+        if not peliculas:
+            return
+        asignar_generos(session, peliculas)
+        session.commit()
+
+
+def optimize_database():
+    """
+    Ejecuta PRAGMA optimize para que SQLite actualice las estadísticas
+    que usa el planificador de consultas. Se llama una vez al iniciar.
+    """
+    if engine.dialect.name != "sqlite":
+        return
+    with engine.connect() as connection:
+        connection.execute(text("PRAGMA optimize"))
+
+
+def checkpoint_wal():
+    """
+    Vuelca el archivo WAL a la base de datos y lo trunca.
+    Se llama al cerrar la aplicación para que el WAL no crezca sin límite.
+    """
+    if engine.dialect.name != "sqlite":
+        return
+    with engine.connect() as connection:
+        connection.execute(text("PRAGMA wal_checkpoint(TRUNCATE)"))
+
+
 class DatabaseSession:
     """
     Context manager para manejar sesiones de base de datos.
@@ -91,9 +200,13 @@ class DatabaseSession:
 
 
 def init_sample_data():
-    with Session(engine) as session:
+    """
+    Inserta datos de ejemplo si la base de datos está vacía.
+    Todo se guarda en una única transacción.
+    """
+    with Session(engine) as session, session.begin():
         # 1. Verificar si ya hay datos
-        if session.exec(select(Usuario)).first():
+        if session.exec(select(Usuario.id).limit(1)).first() is not None:
             print("⚠️  Ya hay datos. No se agregarán más.")
             return
 
@@ -105,16 +218,25 @@ def init_sample_data():
             Usuario(nombre="Carlos", correo="carlos@ejemplo.com"),
         ]
         peliculas = [
-            Pelicula(titulo="El Padrino", genero="Drama", año=1972),
-            Pelicula(titulo="El Señor de los Anillos", genero="Fantasía", año=2001),
+            Pelicula(
+                titulo="El Padrino", director="Francis Ford Coppola",
+                genero="Drama", duracion=175, año=1972, clasificacion="R"
+            ),
+            Pelicula(
+                titulo="El Señor de los Anillos", director="Peter Jackson",
+                genero="Fantasía", duracion=178, año=2001, clasificacion="PG-13"
+            ),
         ]
+        session.add_all(usuarios + peliculas)
+
+        # 3. Obtener los ids generados sin cerrar la transacción
+        session.flush()
         favoritos = [
-            Favorito(usuario_id=1, pelicula_id=1),
-            Favorito(usuario_id=1, pelicula_id=2),
-            Favorito(usuario_id=2, pelicula_id=2),
+            Favorito(id_usuario=usuarios[0].id, id_pelicula=peliculas[0].id),
+            Favorito(id_usuario=usuarios[0].id, id_pelicula=peliculas[1].id),
+            Favorito(id_usuario=usuarios[1].id, id_pelicula=peliculas[1].id),
         ]
+        session.add_all(favoritos)
 
-        # 3. Guardar todo
-        session.add_all(usuarios + peliculas + favoritos)
-        session.commit()
-        print("✅ Datos creados exitosamente")
+    # 4. Al salir de session.begin() se hace commit de todo
+    print("✅ Datos creados exitosamente")
@@ -4,11 +4,12 @@ Define la estructura de las tablas de la base de datos.
 SQLModel combina SQLAlchemy con Pydantic para validación automática.
 """
 
-from sqlmodel import SQLModel, Field, Relationship
+from sqlmodel import SQLModel, Field, Relationship, Session, select, col
 from typing import Optional, List
 from datetime import datetime
-from sqlalchemy import UniqueConstraint
-from pydantic import field_validator
+from sqlalchemy import Index, event, inspect
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 
 class Usuario(SQLModel, table=True):
     """
@@ -22,15 +23,7 @@ class Usuario(SQLModel, table=True):
     
     favoritos: List["Favorito"] = Relationship(back_populates="usuario")
     
-    # Opcional - Agregar validadores personalizados
-    @field_validator('correo')
-    def validar_correo(cls, v):
-        """
-        Valida que el correo electrónico tenga un formato válido y lo convierte a minúsculas.
-        """
-        if '@' not in v:
-            raise ValueError('Correo electrónico inválido')
-        return v.lower()
+    # El formato del correo se valida en los esquemas (app/schemas.py)
 
     def __repr__(self):
         """Representación en string del objeto Usuario."""
@@ -43,6 +36,37 @@ class Usuario(SQLModel, table=True):
 
 
 
+# Modelo PeliculaGenero
+class PeliculaGenero(SQLModel, table=True):
+    """
+    Tabla de unión entre películas y géneros.
+    Se mantiene automáticamente a partir de Pelicula.genero (ver _sincronizar_generos).
+    """
+    id_pelicula: Optional[int] = Field(
+        default=None, foreign_key="pelicula.id", primary_key=True, ondelete="CASCADE"
+    )
+    id_genero: Optional[int] = Field(
+        default=None, foreign_key="genero.id", primary_key=True, index=True
+    )
+
+    # La clave primaria compuesta ya identifica la fila; no hace falta rowid
+    __table_args__ = {"sqlite_with_rowid": False}
+
+
+# Modelo Genero
+class Genero(SQLModel, table=True):
+    """
+    Modelo de Género.
+    Catálogo normalizado de los géneros que aparecen en Pelicula.genero.
+    """
+    id: Optional[int] = Field(default=None, primary_key=True)
+    nombre: str = Field(unique=True, max_length=100, index=True)
+
+    peliculas: List["Pelicula"] = Relationship(
+        back_populates="generos", link_model=PeliculaGenero
+    )
+
+
 # Modelo Pelicula
 class Pelicula(SQLModel, table=True):
     """
@@ -61,8 +85,9 @@ class Pelicula(SQLModel, table=True):
     
     # Definir relaciones con otros modelos
     favoritos: List["Favorito"] = Relationship(back_populates="pelicula")
-    
-    pass
+    generos: List[Genero] = Relationship(
+        back_populates="peliculas", link_model=PeliculaGenero
+    )
 
 
 # Modelo Favorito
@@ -73,12 +98,76 @@ class Favorito(SQLModel, table=True):
     """
     id: Optional[int] = Field(default=None, primary_key=True)
     id_usuario: int = Field(foreign_key="usuario.id")
-    id_pelicula: int = Field(foreign_key="pelicula.id")
+    id_pelicula: int = Field(foreign_key="pelicula.id", index=True)
     fecha_marcado: datetime = Field(default_factory=datetime.now)
     
     # Definir relaciones con otros modelos
     usuario: Optional[Usuario] = Relationship(back_populates="favoritos")
     pelicula: Optional[Pelicula] = Relationship(back_populates="favoritos")
     
-    # Evita que un usuario marque la misma película como favorita más de una vez
-    __table_args__ = (UniqueConstraint("id_usuario", "id_pelicula", name="unique_user_movie"),)
+    # Evita que un usuario marque la misma película como favorita más de una vez.
+    # El índice único compuesto también sirve las búsquedas por id_usuario
+    # (columna líder) y las verificaciones por (id_usuario, id_pelicula).
+    __table_args__ = (
+        Index("ix_fav_user_movie", "id_usuario", "id_pelicula", unique=True),
+    )
+
+
+def _separar_generos(genero: Optional[str]) -> List[str]:
+    """Separa un texto como "Drama, Crimen" en nombres de género sin repetir."""
+    if not genero:
+        return []
+    return list(dict.fromkeys(g.strip() for g in genero.split(",") if g.strip()))
+
+
+# INSERT ... ON CONFLICT DO NOTHING para los dialectos que lo soportan
+_INSERT_POR_DIALECTO = {"sqlite": sqlite_insert, "postgresql": postgresql_insert}
+
+
+def _buscar_generos(session: Session, nombres) -> dict:
+    """Retorna los Genero existentes con esos nombres, indexados por nombre."""
+    statement = select(Genero).where(col(Genero.nombre).in_(nombres))
+    return {g.nombre: g for g in session.exec(statement).all()}
+
+
+def asignar_generos(session: Session, peliculas: List[Pelicula]):
+    """
+    Asigna a cada película los registros Genero que corresponden a su campo genero,
+    creando los que todavía no existen.
+    Los géneros nuevos se insertan con ON CONFLICT DO NOTHING y se vuelven a
+    consultar, así dos peticiones que crean el mismo género a la vez no fallan
+    por el índice único de Genero.nombre.
+    """
+    nombres = {n for pelicula in peliculas for n in _separar_generos(pelicula.genero)}
+    with session.no_autoflush:
+        existentes = _buscar_generos(session, nombres) if nombres else {}
+        faltantes = nombres - existentes.keys()
+        insert = _INSERT_POR_DIALECTO.get(session.get_bind().dialect.name)
+        if faltantes and insert is not None:
+            session.execute(
+                insert(Genero)
+                .values([{"nombre": n} for n in sorted(faltantes)])
+                .on_conflict_do_nothing()
+            )
+            existentes = _buscar_generos(session, nombres)
+        for pelicula in peliculas:
+            pelicula.generos = [
+                existentes.get(n) or existentes.setdefault(n, Genero(nombre=n))
+                for n in _separar_generos(pelicula.genero)
+            ]
+
+
+@event.listens_for(Session, "before_flush")
+def _sincronizar_generos(session, flush_context, instances):
+    """
+    Mantiene PeliculaGenero al día cuando se crea una película
+    o cambia su campo genero, sin importar desde dónde se guarde.
+    """
+    peliculas = [
+        obj for obj in session.new if isinstance(obj, Pelicula)
+    ] + [
+        obj for obj in session.dirty
+        if isinstance(obj, Pelicula) and inspect(obj).attrs.genero.history.has_changes()
+    ]
+    if peliculas:
+        asignar_generos(session, peliculas)
@@ -6,7 +6,7 @@ Endpoints para gestionar las relaciones de favoritos entre usuarios y películas
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlmodel import Session, select, col
 from typing import List
-from sqlalchemy import func, or_
+from sqlalchemy import delete, func, or_
 
 from app.database import get_session
 from app.models import Favorito, Usuario, Pelicula
@@ -72,12 +72,12 @@ def crear_favorito(
         )
     
     # Verificar si ya existe el favorito
-    statement = select(Favorito).where(
+    statement = select(Favorito.id).where(
         Favorito.id_usuario == favorito.id_usuario,
         Favorito.id_pelicula == favorito.id_pelicula
-    )
+    ).limit(1)
     existing_favorito = session.exec(statement).first()
-    if existing_favorito:
+    if existing_favorito is not None:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Este favorito ya existe"
@@ -293,13 +293,8 @@ def eliminar_todos_favoritos_usuario(
             detail=f"Usuario con id {usuario_id} no encontrado"
         )
     
-    # Eliminar todos los favoritos del usuario
-    statement = select(Favorito).where(Favorito.id_usuario == usuario_id)
-    favoritos = session.exec(statement).all()
-    
-    for favorito in favoritos:
-        session.delete(favorito)
-    
+    # Eliminar todos los favoritos del usuario en un solo DELETE
+    session.exec(delete(Favorito).where(Favorito.id_usuario == usuario_id))
     session.commit()
     return None
 
@@ -6,10 +6,10 @@ Endpoints para gestionar películas en la plataforma.
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlmodel import Session, select, col
 from typing import List, Optional
-from sqlalchemy import func
+from sqlalchemy import delete, func
 
 from app.database import get_session
-from app.models import Pelicula, Favorito
+from app.models import Pelicula, Favorito, PeliculaGenero
 from app.schemas import PeliculaCreate, PeliculaRead, PeliculaUpdate
 
 # Crear el router con prefijo y tags
@@ -56,13 +56,13 @@ def crear_pelicula(
     - **sinopsis**: Breve descripción de la trama
     """
     # Verificar que no exista una película con el mismo título y año
-    statement = select(Pelicula).where(
+    statement = select(Pelicula.id).where(
         Pelicula.titulo.ilike(f"%{pelicula.titulo}%"),
         Pelicula.año == pelicula.año
-    )
+    ).limit(1)
     
-    existing_pelicula = session.exec(statement) .first()
-    if existing_pelicula:
+    existing_pelicula = session.exec(statement).first()
+    if existing_pelicula is not None:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Ya existe una película con el título '{pelicula.titulo}' del año {pelicula.año}"
@@ -155,14 +155,15 @@ def eliminar_pelicula(
             detail=f"Película con id {pelicula_id} no encontrada"
         )
     
-    # Eliminar los favoritos asociados a esta película primero
-    statement = select(Favorito).where(Favorito.id_pelicula == pelicula_id)
-    favoritos_a_eliminar = session.exec(statement).all()
-    for favorito in favoritos_a_eliminar:
-        session.delete(favorito)
+    # Eliminar los favoritos asociados a esta película primero (un solo DELETE)
+    session.exec(delete(Favorito).where(Favorito.id_pelicula == pelicula_id))
+    
+    # Eliminar sus géneros: el DELETE masivo no pasa por la relación del ORM
+    # y no se puede depender de que la conexión tenga foreign_keys=ON
+    session.exec(delete(PeliculaGenero).where(PeliculaGenero.id_pelicula == pelicula_id))
     
     # Ahora eliminar la película
-    session.delete(pelicula)
+    session.exec(delete(Pelicula).where(Pelicula.id == pelicula_id))
     session.commit()
     return None
 
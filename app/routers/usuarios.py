@@ -3,17 +3,20 @@ Router de Usuarios.
 Endpoints para gestionar usuarios en la plataforma.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy import bindparam, delete, func, lambda_stmt
+from sqlalchemy.exc import IntegrityError
 from sqlmodel import Session, select
-from typing import List
-from collections import Counter
+from typing import List, Optional
 
 from app.database import get_session
-from app.models import Usuario, Favorito, Pelicula
+from app.models import Usuario, Favorito, Pelicula, Genero, PeliculaGenero
 from app.schemas import (
     UsuarioCreate,
     UsuarioRead,
     UsuarioUpdate,
+    UsuarioReadListAdapter,
+    UsuarioEstadisticas,
     PeliculaRead
 )
 
@@ -24,22 +27,87 @@ router = APIRouter(
 )
 
 
+# Mensajes 404 por modelo para _get_or_404
+_NO_ENCONTRADO = {
+    Usuario: "Usuario con id {} no encontrado",
+    Pelicula: "Película con id {} no encontrada",
+}
+
+
+def _get_or_404(session: Session, model, pk: int):
+    """
+    Busca un registro por su clave primaria o lanza un 404.
+    session.get consulta primero el identity map de la sesión, por lo que
+    repetir la búsqueda dentro de la misma petición no vuelve a la base de datos.
+    """
+    obj = session.get(model, pk)
+    if obj is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=_NO_ENCONTRADO[model].format(pk)
+        )
+    return obj
+
+
+# Consultas frecuentes construidas una sola vez con lambda_stmt: SQLAlchemy
+# reutiliza el SQL compilado y en cada petición solo cambian los parámetros
+_PELICULAS_FAVORITAS_DE_USUARIO = lambda_stmt(
+    lambda: select(Usuario.id, Pelicula)
+    .outerjoin(Favorito, Favorito.id_usuario == Usuario.id)
+    .outerjoin(Pelicula, Pelicula.id == Favorito.id_pelicula)
+    .where(Usuario.id == bindparam("usuario_id"))
+)
+
+_FAVORITO_DE_USUARIO = lambda_stmt(
+    lambda: select(Favorito).where(
+        Favorito.id_usuario == bindparam("usuario_id"),
+        Favorito.id_pelicula == bindparam("pelicula_id")
+    )
+)
+
+
 # Endpoint para listar todos los usuarios
-@router.get("/", response_model=List[UsuarioRead])
+@router.get(
+    "/",
+    response_model=None,
+    responses={status.HTTP_200_OK: {"model": List[UsuarioRead]}}
+)
 def listar_usuarios(
     session: Session = Depends(get_session),
-    skip: int = 0,
-    limit: int = 100
+    after_id: Optional[int] = None,
+    limit: int = 100,
+    skip: Optional[int] = Query(None, include_in_schema=False)
 ):
     """
-    Lista todos los usuarios registrados.
+    Lista todos los usuarios registrados, ordenados por ID.
     
-    - **skip**: Número de registros a omitir (para paginación)
+    - **after_id**: Retorna solo usuarios con ID mayor a este (cursor de paginación)
     - **limit**: Número máximo de registros a retornar
+    
+    Si la página está completa, el encabezado `X-Next-Cursor` trae el valor
+    de `after_id` para pedir la siguiente.
     """
-    # Consultar todos los usuarios con paginación
-    usuarios = session.exec(select(Usuario).offset(skip).limit(limit)).all()
-    return usuarios
+    # skip ya no se soporta: se rechaza para que los clientes antiguos no
+    # reciban siempre la primera página sin darse cuenta
+    if skip is not None:
+        raise HTTPException(
+            status_code=422,  # mismo código que usa FastAPI para parámetros inválidos
+            detail="El parámetro skip ya no se soporta; usa after_id con el valor de X-Next-Cursor"
+        )
+    # Paginación por cursor sobre la clave primaria: cada página es una
+    # búsqueda en el índice, sin recorrer las filas anteriores como OFFSET
+    statement = select(Usuario).order_by(Usuario.id).limit(limit)
+    if after_id is not None:
+        statement = statement.where(Usuario.id > after_id)
+    usuarios = session.exec(statement).all()
+    # Serializar directamente a JSON con el adaptador precompilado
+    response = Response(
+        content=UsuarioReadListAdapter.dump_json(usuarios),
+        media_type="application/json"
+    )
+    if usuarios and len(usuarios) == limit:
+        response.headers["X-Next-Cursor"] = str(usuarios[-1].id)
+    return response
 
 
 # Endpoint para crear un nuevo usuario
@@ -54,23 +122,17 @@ def crear_usuario(
     - **nombre**: Nombre del usuario
     - **correo**: Correo electrónico único
     """
-    # Verificar que el correo no exista
-    existing_user = session.exec(
-        select(Usuario).where(
-            Usuario.correo == usuario.correo
-        )
-    ).first()
-
-    if existing_user:
+    # Crear el nuevo usuario; el índice único de correo rechaza duplicados
+    db_usuario = Usuario.model_validate(usuario)
+    session.add(db_usuario)
+    try:
+        session.commit()
+    except IntegrityError:
+        session.rollback()
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="El correo ya está registrado"
         )
-    
-    # Crear el nuevo usuario
-    db_usuario = Usuario.model_validate(usuario)
-    session.add(db_usuario)
-    session.commit()
     session.refresh(db_usuario)
     
     return db_usuario
@@ -88,13 +150,7 @@ def obtener_usuario(
     - **usuario_id**: ID del usuario
     """
     # Buscar el usuario por ID
-    usuario = session.get(Usuario, usuario_id)
-    #si no se encuentra el usuario
-    if not usuario:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Usuario con id {usuario_id} no encontrado"
-        )
+    usuario = _get_or_404(session, Usuario, usuario_id)
     return usuario
 
 
@@ -113,31 +169,22 @@ def actualizar_usuario(
     - **correo**: Nuevo correo (opcional)
     """
     # Buscar el usuario
-    db_usuario = session.get(Usuario, usuario_id)
-    if not db_usuario:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Usuario con id {usuario_id} no encontrado"
-        ) 
+    db_usuario = _get_or_404(session, Usuario, usuario_id)
     
-    # Si se actualiza el correo, verificar que no exista
-    if usuario_update.correo and usuario_update.correo != db_usuario.correo:
-        existing_user = session.exec(
-            select(Usuario).where(
-                Usuario.correo == usuario_update.correo
-            )
-        ).first()
-        if existing_user:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="El correo ya está registrado"
-            )
     # Actualizar solo los campos proporcionados
     usuario_data = usuario_update.model_dump(exclude_unset=True)
     for key, value in usuario_data.items():
         setattr(db_usuario, key, value)
     session.add(db_usuario)
-    session.commit()
+    # Si el nuevo correo ya existe, el índice único lo rechaza
+    try:
+        session.commit()
+    except IntegrityError:
+        session.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="El correo ya está registrado"
+        )
     session.refresh(db_usuario)
     
     return db_usuario
@@ -157,21 +204,13 @@ def eliminar_usuario(
     También se eliminarán todos los favoritos asociados al usuario.
     """
     # Buscar el usuario
-    usuario = session.get(Usuario, usuario_id)
-    if not usuario:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Usuario con id {usuario_id} no encontrado"
-        )
+    _get_or_404(session, Usuario, usuario_id)
     
-    # Eliminar los favoritos asociados al usuario primero
-    statement = select(Favorito).where(Favorito.id_usuario == usuario_id)
-    favoritos_a_eliminar = session.exec(statement).all()
-    for favorito in favoritos_a_eliminar:
-        session.delete(favorito)
+    # Eliminar los favoritos asociados al usuario primero (un solo DELETE)
+    session.exec(delete(Favorito).where(Favorito.id_usuario == usuario_id))
 
     # Ahora eliminar el usuario
-    session.delete(usuario)
+    session.exec(delete(Usuario).where(Usuario.id == usuario_id))
     session.commit()
     return None
 
@@ -187,19 +226,19 @@ def listar_favoritos_usuario(
     
     - **usuario_id**: ID del usuario
     """
-    #  Verificar que el usuario existe
-    usuario = session.get(Usuario, usuario_id)
-    if not usuario:
+    #  Obtener el usuario y sus películas favoritas en una sola consulta.
+    #  El outer join devuelve una fila (sin película) aunque no tenga
+    #  favoritos, y ninguna fila si el usuario no existe.
+    filas = session.exec(
+        _PELICULAS_FAVORITAS_DE_USUARIO, params={"usuario_id": usuario_id}
+    ).all()
+    if not filas:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Usuario con id {usuario_id} no encontrado"
         )
     
-    #  Obtener las películas favoritas del usuario
-    statement = select(Pelicula).join(Favorito).where(Favorito.id_usuario == usuario_id)
-    
-    # Ejecutar la consulta
-    peliculas = session.exec(statement).all()
+    peliculas = [pelicula for _, pelicula in filas if pelicula is not None]
     
     return peliculas
 
@@ -220,42 +259,24 @@ def marcar_favorito(
     - **usuario_id**: ID del usuario
     - **pelicula_id**: ID de la película
     """
-    # Verificar que el usuario existe
-    usuario = session.get(Usuario, usuario_id)
-    if not usuario:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Usuario con id {usuario_id} no encontrado"
-        )
-    
-    # Verificar que la película existe
-    pelicula = session.get(Pelicula, pelicula_id)
-    if not pelicula:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Película con id {pelicula_id} no encontrada"
-        )
+    # Verificar que el usuario y la película existen
+    _get_or_404(session, Usuario, usuario_id)
+    _get_or_404(session, Pelicula, pelicula_id)
    
-    # Verificar si ya existe el favorito
-    statement = select(Favorito).where(
-        Favorito.id_usuario == usuario_id,
-        Favorito.id_pelicula == pelicula_id
-    )
-    existing_favorito = session.exec(statement).first()
-    if existing_favorito:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="La película ya está marcada como favorita"
-        )
-    
-    #  Crear el favorito
+    #  Crear el favorito; el índice único ix_fav_user_movie rechaza duplicados
     favorito = Favorito(
         id_usuario=usuario_id,
         id_pelicula=pelicula_id
     )
     session.add(favorito)
-    session.commit()
-    session.refresh(favorito)
+    try:
+        session.commit()
+    except IntegrityError:
+        session.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="La película ya está marcada como favorita"
+        )
     
     return {"message": "Película marcada como favorita exitosamente"}
 
@@ -277,11 +298,10 @@ def eliminar_favorito(
     - **pelicula_id**: ID de la película
     """
     # Buscar el favorito
-    statement = select(Favorito).where(
-        Favorito.id_usuario == usuario_id,
-        Favorito.id_pelicula == pelicula_id
-    )
-    favorito = session.exec(statement).first()
+    favorito = session.exec(
+        _FAVORITO_DE_USUARIO,
+        params={"usuario_id": usuario_id, "pelicula_id": pelicula_id}
+    ).scalars().first()
     
     if not favorito:
         raise HTTPException(
@@ -297,7 +317,7 @@ def eliminar_favorito(
 
 
 # Opcional - Endpoint para estadísticas del usuario
-@router.get("/{usuario_id}/estadisticas")
+@router.get("/{usuario_id}/estadisticas", response_model=UsuarioEstadisticas)
 def obtener_estadisticas_usuario(
     usuario_id: int,
     session: Session = Depends(get_session)
@@ -308,31 +328,27 @@ def obtener_estadisticas_usuario(
     - **usuario_id**: ID del usuario
     """
     # Verificar que el usuario existe
-    usuario = session.get(Usuario, usuario_id)
-    if not usuario:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Usuario con id {usuario_id} no encontrado"
-        )
+    _get_or_404(session, Usuario, usuario_id)
 
-    # Obtener las películas favoritas del usuario para calcular las estadísticas
-    statement = select(Pelicula).join(Favorito).where(Favorito.id_usuario == usuario_id)
-    peliculas = session.exec(statement).all()
-
-    # Calcular número total de favoritos
-    total_favoritos = len(peliculas)
-        
-    # Obtener géneros más favoritos
-    generos = []
-    for pelicula in peliculas:
-        if pelicula.genero:
-            generos.extend([g.strip() for g in pelicula.genero.split(",")])
+    # Calcular total de favoritos y tiempo total en una sola consulta
+    statement = (
+        select(func.count(Pelicula.id), func.coalesce(func.sum(Pelicula.duracion), 0))
+        .join(Favorito)
+        .where(Favorito.id_usuario == usuario_id)
+    )
+    total_favoritos, tiempo_total = session.exec(statement).one()
 
-    
-    generos_counter = Counter(generos)
-    generos_comunes = generos_counter.most_common(3)
-    # Calcular tiempo total de películas favoritas
-    tiempo_total = sum(p.duracion for p in peliculas if p.duracion)
+    # Géneros más frecuentes entre los favoritos, agregados en SQL
+    statement = (
+        select(Genero.nombre, func.count(Favorito.id))
+        .join(PeliculaGenero, PeliculaGenero.id_genero == Genero.id)
+        .join(Favorito, Favorito.id_pelicula == PeliculaGenero.id_pelicula)
+        .where(Favorito.id_usuario == usuario_id)
+        .group_by(Genero.id)
+        .order_by(func.count(Favorito.id).desc(), Genero.nombre)
+        .limit(3)
+    )
+    generos_comunes = session.exec(statement).all()
     
     return {
         "usuario_id": usuario_id,
@@ -5,23 +5,39 @@ Estos esquemas se usan en los endpoints de la API para:
 - Serializar datos de salida (response)
 """
 
-from pydantic import BaseModel, EmailStr, Field, ConfigDict
-from typing import Optional, List
+from pydantic import AfterValidator, BaseModel, EmailStr, Field, ConfigDict, TypeAdapter
+from typing import Annotated, Any, Optional, List
 from datetime import datetime
 
 
+class BaseSchema(BaseModel):
+    """
+    Clase base de todos los esquemas.
+    Ignora campos extra, no revalida al asignar atributos y
+    elimina espacios al inicio y final de los textos.
+    """
+    model_config = ConfigDict(
+        extra="ignore",
+        validate_assignment=False,
+        str_strip_whitespace=True
+    )
+
+
 # =============================================================================
 # ESQUEMAS DE USUARIO
 # =============================================================================
 
+# Correo validado por EmailStr y guardado en minúsculas
+Correo = Annotated[EmailStr, AfterValidator(str.lower)]
 
-class UsuarioCreate(BaseModel):
+
+class UsuarioCreate(BaseSchema):
     """
     Schema para crear un nuevo usuario.
     No incluye id ni fecha_registro (se generan automáticamente).
     """
     nombre: str = Field(min_length=1, max_length=100, description="Nombre del usuario")
-    correo: EmailStr = Field(description="Correo electrónico único")
+    correo: Correo = Field(description="Correo electrónico único")
     
     
     model_config = ConfigDict(
@@ -32,20 +48,18 @@ class UsuarioCreate(BaseModel):
             }
         }
     )
-pass
 
 
-class UsuarioUpdate(BaseModel):
+class UsuarioUpdate(BaseSchema):
     """
     Schema para actualizar un usuario existente.
     Todos los campos son opcionales.
     """
     nombre: Optional[str] = Field(None, min_length=1, max_length=100)
-    correo: Optional[EmailStr] = None
-    pass
+    correo: Optional[Correo] = None
 
 
-class UsuarioRead(BaseModel):
+class UsuarioRead(BaseSchema):
     """
     Schema para retornar información de un usuario.
     Incluye todos los campos del modelo.
@@ -56,7 +70,11 @@ class UsuarioRead(BaseModel):
     fecha_registro: datetime
     
     model_config = ConfigDict(from_attributes=True)
-    pass
+
+
+# Adaptador precompilado para serializar listas de usuarios sin que
+# FastAPI tenga que revalidar la respuesta en cada petición
+UsuarioReadListAdapter = TypeAdapter(List[UsuarioRead])
 
 
 class UsuarioWithFavoritos(UsuarioRead):
@@ -64,7 +82,25 @@ class UsuarioWithFavoritos(UsuarioRead):
     Schema para retornar un usuario con sus películas favoritas.
     """
     favoritos: List["FavoritoRead"] = []
-    pass
+
+
+class GeneroCantidad(BaseSchema):
+    """
+    Schema para un género y la cantidad de películas favoritas que lo incluyen.
+    """
+    genero: str
+    cantidad: int
+
+
+class UsuarioEstadisticas(BaseSchema):
+    """
+    Schema para retornar las estadísticas de un usuario.
+    """
+    usuario_id: int
+    total_peliculas_favoritas: int
+    generos_preferidos: List[GeneroCantidad]
+    tiempo_total_minutos: int
+    tiempo_total_formateado: str
 
 
 # =============================================================================
@@ -72,7 +108,7 @@ class UsuarioWithFavoritos(UsuarioRead):
 # =============================================================================
 
 # Schema para crear una película (request)
-class PeliculaCreate(BaseModel):
+class PeliculaCreate(BaseSchema):
     """
     Schema para crear una nueva película.
     """
@@ -97,11 +133,10 @@ class PeliculaCreate(BaseModel):
             }
         }
     )
-    pass
 
 
 #  Schema para actualizar una película (request)
-class PeliculaUpdate(BaseModel):
+class PeliculaUpdate(BaseSchema):
     """
     Schema para actualizar una película existente.
     Todos los campos son opcionales.
@@ -113,11 +148,10 @@ class PeliculaUpdate(BaseModel):
     año: Optional[int] = Field(None, ge=1888, le=2100)
     clasificacion: Optional[str] = None
     sinopsis: Optional[str] = None
-    pass
 
 
 #  Schema para leer una película (response)
-class PeliculaRead(BaseModel):
+class PeliculaRead(BaseSchema):
     """
     Schema para retornar información de una película.
     """
@@ -132,7 +166,6 @@ class PeliculaRead(BaseModel):
     fecha_creacion: datetime
     
     model_config = ConfigDict(from_attributes=True)
-    pass
 
 
 # =============================================================================
@@ -140,17 +173,16 @@ class PeliculaRead(BaseModel):
 # =============================================================================
 
 # Schema para crear un favorito (request)
-class FavoritoCreate(BaseModel):
+class FavoritoCreate(BaseSchema):
     """
     Schema para marcar una película como favorita.
     """
     id_usuario: int = Field(gt=0)
     id_pelicula: int = Field(gt=0)
-    pass
 
 
 # Schema para leer un favorito (response)
-class FavoritoRead(BaseModel):
+class FavoritoRead(BaseSchema):
     """
     Schema para retornar información de un favorito.
     """
@@ -160,7 +192,6 @@ class FavoritoRead(BaseModel):
     fecha_marcado: datetime
     
     model_config = ConfigDict(from_attributes=True)
-    pass
 
 
 # Schema para favorito con información completa (response)
@@ -170,7 +201,6 @@ class FavoritoWithDetails(FavoritoRead):
     """
     usuario: UsuarioRead
     pelicula: PeliculaRead
-    pass
 
 
 # =============================================================================
@@ -178,38 +208,51 @@ class FavoritoWithDetails(FavoritoRead):
 # =============================================================================
 
 # Schema para respuestas con mensajes
-class MessageResponse(BaseModel):
+class MessageResponse(BaseSchema):
     """
     Schema genérico para respuestas con mensajes.
     """
     message: str
     detail: Optional[str] = None
-    pass
+
+
+# Schema para la respuesta del health check
+class HealthResponse(BaseSchema):
+    """
+    Schema para el estado de la API y de la base de datos.
+    """
+    status: str
+    database: str
+    timestamp: datetime
 
 
 # Schema para respuestas paginadas
-class PaginatedResponse(BaseModel):
+class PaginatedResponse(BaseSchema):
     """
     Schema genérico para respuestas paginadas.
+    Los items ya vienen validados por el endpoint, por eso no se
+    vuelven a validar aquí.
     """
-    items: List[BaseModel]
+    items: List[Any]
     total: int
     page: int = 1
     size: int = 50
     pages: int
-    pass
 
 
 # Opcional - Schema para búsqueda de películas
-class PeliculaSearchParams(BaseModel):
+class PeliculaSearchParams(BaseSchema):
     """
     Parámetros de búsqueda para películas.
+    Los atributos usan nombres ASCII (anio); en el JSON se siguen
+    recibiendo como "año", "año_min" y "año_max".
     """
     titulo: Optional[str] = None
     director: Optional[str] = None
     genero: Optional[str] = None
-    año: Optional[int] = None
-    año_min: Optional[int] = None
-    año_max: Optional[int] = None
-    pass
+    anio: Optional[int] = Field(None, alias="año")
+    anio_min: Optional[int] = Field(None, alias="año_min")
+    anio_max: Optional[int] = Field(None, alias="año_max")
+    
+    model_config = ConfigDict(populate_by_name=True)
 
@@ -1,29 +1,105 @@
-import datetime
-from fastapi import FastAPI, Request, Depends
+import anyio
+from datetime import datetime, timezone
+import logging
+import os
+import sys
+from logging.handlers import QueueHandler, QueueListener
+from queue import SimpleQueue
+from fastapi import FastAPI, Depends, Request, Response
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.openapi.docs import (
+    get_redoc_html,
+    get_swagger_ui_html,
+    get_swagger_ui_oauth2_redirect_html,
+)
 from contextlib import asynccontextmanager
 from sqlalchemy import text
 from sqlalchemy.orm import Session
-from time import time
+from time import monotonic, perf_counter_ns
+import uvicorn
 
-from app.database import create_db_and_tables, get_session
+from app.database import (
+    create_db_and_tables,
+    check_database_connection,
+    init_sample_data,
+    sincronizar_generos,
+    optimize_database,
+    checkpoint_wal,
+    get_session
+)
 from app.routers import usuarios, peliculas, favoritos
+from app.schemas import HealthResponse
 
 # Importar la configuración desde app.config
 from app.config import settings
 
 
+class _DeferredQueueHandler(QueueHandler):
+    """
+    QueueHandler que encola el registro sin formatearlo.
+    El formateo del mensaje lo hace el hilo del QueueListener.
+    """
+
+    def prepare(self, record):
+        return record
+
+
+# Logger de accesos: en el request solo se encola el registro, la escritura
+# a consola ocurre en el hilo del QueueListener (se inicia en lifespan)
+_log_queue = SimpleQueue()
+access_logger = logging.getLogger("api.access")
+access_logger.setLevel(settings.access_log_level)
+access_logger.propagate = False
+
+# Rutas de monitoreo y documentación que se registran solo en nivel DEBUG
+_QUIET_PATHS = frozenset({"/health", "/docs", "/redoc", "/openapi.json"})
+
+
+# Variable de entorno que marca que el proceso principal ya preparó la
+# base de datos antes de crear los workers de uvicorn
+_BD_INICIALIZADA = "API_PELICULAS_BD_INICIALIZADA"
+
+
+def _inicializar_base_de_datos():
+    """
+    Crea las tablas y prepara la base de datos al iniciar la aplicación.
+    """
+    create_db_and_tables()
+    check_database_connection()
+    if settings.environment == "development":
+        init_sample_data()
+    sincronizar_generos()
+    optimize_database()
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """
     Gestor de ciclo de vida de la aplicación.
     Se ejecuta al iniciar y al cerrar la aplicación.
     """
-    # Startup: Crear tablas en la base de datos
-    create_db_and_tables()
+    # Startup: se ejecuta una sola vez por proceso, nunca por petición
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(
+        logging.Formatter(settings.log_format, settings.log_date_format)
+    )
+    log_listener = QueueListener(_log_queue, stream_handler)
+    log_listener.start()
+    queue_handler = _DeferredQueueHandler(_log_queue)
+    access_logger.addHandler(queue_handler)
+
+    # El trabajo de base de datos es bloqueante: se ejecuta en un hilo
+    # para que el event loop siga atendiendo señales y sondas. Con varios
+    # workers ya lo hizo el proceso principal (ver __main__)
+    if not os.environ.get(_BD_INICIALIZADA):
+        await anyio.to_thread.run_sync(_inicializar_base_de_datos)
     yield
     
     # Shutdown: Limpiar recursos si es necesario
+    await anyio.to_thread.run_sync(checkpoint_wal)
+    access_logger.removeHandler(queue_handler)
+    log_listener.stop()
     print("cerrando aplicación...")
 
 
@@ -42,17 +118,73 @@ app = FastAPI(
     license_info={
         "name": "MIT",
     },
+    # El esquema OpenAPI y las páginas de documentación se sirven más abajo
+    # con el JSON cacheado en bytes (ver openapi_json)
+    openapi_url=None,
+    docs_url=None,
+    redoc_url=None,
 )
 
 
+class AccessLogMiddleware:
+    """
+    Middleware ASGI que registra método, ruta, código de estado y duración
+    de cada petición en el logger de accesos.
+    Es ASGI puro (no BaseHTTPMiddleware) para no crear una tarea y un
+    stream adicionales por petición.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = perf_counter_ns()
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duracion_us = (perf_counter_ns() - start) // 1000
+            path = scope["path"]
+            nivel = logging.DEBUG if path in _QUIET_PATHS or path.startswith("/static") else logging.INFO
+            if access_logger.isEnabledFor(nivel):
+                # La query string solo se decodifica en modo DEBUG
+                query = scope.get("query_string")
+                if query and access_logger.isEnabledFor(logging.DEBUG):
+                    path = f"{path}?{query.decode('latin-1')}"
+                access_logger.log(
+                    nivel, "%s %s %d %dus",
+                    scope["method"], path, status_code, duracion_us
+                )
+
+
+# Starlette ejecuta primero el último middleware agregado: el logger se
+# registra antes que CORS para que CORS quede por fuera y responda los
+# preflight OPTIONS sin pasar por el logger
+app.add_middleware(AccessLogMiddleware)
+
 # Configurar CORS para permitir solicitudes desde diferentes orígenes
 # Esto es importante para desarrollo con frontend separado
+# Métodos y encabezados explícitos + max_age permiten al navegador
+# cachear la respuesta del preflight durante un día
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],  # En producción, especificar orígenes permitidos
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_origins=settings.cors_origins,  # En producción, especificar orígenes permitidos
+    allow_methods=["GET", "POST", "PUT", "DELETE"],
+    allow_headers=["Authorization", "Content-Type"],
+    # El cursor de paginación de usuarios debe ser legible desde otro origen
+    expose_headers=["X-Next-Cursor"],
+    max_age=86400,
 )
 
 
@@ -63,6 +195,80 @@ app.include_router(peliculas.router)
 app.include_router(favoritos.router)
 
 
+# Esquema OpenAPI serializado a JSON por root_path; se genera en la primera
+# petición, cuando ya están registrados todos los routers
+_openapi_bodies = {}
+
+
+def _root_path(request: Request) -> str:
+    """Prefijo con el que el proxy sirve la aplicación, sin la barra final."""
+    return request.scope.get("root_path", "").rstrip("/")
+
+
+@app.get("/openapi.json", include_in_schema=False)
+async def openapi_json(request: Request):
+    """
+    Retorna el esquema OpenAPI, serializándolo una sola vez por root_path.
+    Igual que la ruta de FastAPI, detrás de un proxy con prefijo agrega
+    root_path a servers para que "Try it out" use la URL con el prefijo.
+    """
+    root_path = _root_path(request)
+    body = _openapi_bodies.get(root_path)
+    if body is None:
+        schema = app.openapi()
+        if root_path and app.root_path_in_servers:
+            servers = schema.get("servers", [])
+            if root_path not in {s.get("url") for s in servers}:
+                schema = {**schema, "servers": [{"url": root_path}, *servers]}
+        body = _openapi_bodies[root_path] = JSONResponse(schema).body
+    return Response(content=body, media_type="application/json")
+
+
+@app.get("/docs", include_in_schema=False)
+async def swagger_ui_html(request: Request):
+    """Documentación interactiva Swagger UI."""
+    root_path = _root_path(request)
+    return get_swagger_ui_html(
+        openapi_url=root_path + "/openapi.json",
+        title=f"{app.title} - Swagger UI",
+        oauth2_redirect_url=root_path + app.swagger_ui_oauth2_redirect_url,
+    )
+
+
+@app.get(app.swagger_ui_oauth2_redirect_url, include_in_schema=False)
+async def swagger_ui_redirect():
+    """Página de retorno de OAuth2 para Swagger UI."""
+    return get_swagger_ui_oauth2_redirect_html()
+
+
+@app.get("/redoc", include_in_schema=False)
+async def redoc_html(request: Request):
+    """Documentación ReDoc."""
+    return get_redoc_html(
+        openapi_url=_root_path(request) + "/openapi.json", title=f"{app.title} - ReDoc"
+    )
+
+
+# Información básica de la API: no cambia durante la ejecución, así que
+# se serializa a JSON una sola vez al cargar el módulo
+_ROOT_PAYLOAD = {
+    "message": "Bienvenido a la API de Películas",
+    "version": "1.0.0",
+    "documentacion": {
+        "swagger": "/docs",
+        "redoc": "/redoc"
+    },
+    "endpoints_principales":  {
+        "usuarios": "/api/usuarios",
+        "peliculas": "/api/peliculas",
+        "favoritos": "/api/favoritos"
+    },
+    "status": "activo",
+    "entorno": settings.environment
+}
+_ROOT_BODY = JSONResponse(_ROOT_PAYLOAD).body
+
+
 # Crear un endpoint raíz que retorne información básica de la API
 @app.get("/", tags=["Root"])
 async def root():
@@ -70,60 +276,61 @@ async def root():
     Endpoint raíz de la API.
     Retorna información básica y enlaces a la documentación.
     """
-    return {
-        # Agregar información 
-        "message": "Bienvenido a la API de Películas",
-        "version": "1.0.0",
-        "documentacion": {
-            "swagger": "/docs",
-            "redoc": "/redoc"
-        },
-        "endpoints_principales":  {
-            "usuarios": "/api/usuarios",
-            "peliculas": "/api/peliculas",
-            "favoritos": "/api/favoritos"
-        },
-        "status": "activo",
-        "entorno": settings.environment
-    }
+    return Response(content=_ROOT_BODY, media_type="application/json")
+
+
+# Último resultado del chequeo de base de datos, reutilizado durante
+# _HEALTH_TTL segundos para que las sondas frecuentes no consulten cada vez
+_HEALTH_TTL = 2.0
+_HEALTH_CACHE = {"t": float("-inf"), "status": "connected"}
+_HEALTH_QUERY = text("SELECT 1")
 
 
 # Crear un endpoint de health check para monitoreo
-@app.get("/health", tags=["Health"])
+@app.get("/health", tags=["Health"], response_model=HealthResponse)
 async def health_check(db: Session = Depends(get_session)):  # Cambiado de 'dB' a 'db'
     """
     Health check endpoint para verificar el estado de la API.
     Útil para sistemas de monitoreo y orquestación.
+    El estado de la base de datos se guarda en caché durante 2 segundos.
     """
-    try:
-        db.execute(text("SELECT 1"))
-        db_status = "connected"
-    except Exception as e:
-        db_status = f"error: {str(e)}"
+    now = monotonic()
+    if now - _HEALTH_CACHE["t"] > _HEALTH_TTL:
+        try:
+            db.execute(_HEALTH_QUERY)
+            _HEALTH_CACHE["status"] = "connected"
+        except Exception as e:
+            _HEALTH_CACHE["status"] = f"error: {str(e)}"
+        _HEALTH_CACHE["t"] = now
+    db_status = _HEALTH_CACHE["status"]
     return {
         "status": "healthy" if db_status == "connected" else "unhealthy",  # Actualizado para reflejar el estado real
         "database": db_status,
-        "timestamp": datetime.utcnow().isoformat()
+        "timestamp": datetime.now(timezone.utc)
     }
 
 
-@app.middleware("http")
-async def log_requests(request: Request, call_next):
-    start_time = time()
-    response = await call_next(request)
-    process_time = time() - start_time
-    
-    print(f"{request.method} {request.url} - {response.status_code} - {process_time:.2f}s")
-    return response
-
-
 if __name__ == "__main__":
-    import uvicorn
-    
+    desarrollo = settings.environment == "development"
+    workers = 1 if desarrollo else (settings.workers or os.cpu_count() or 1)
+    if workers > 1:
+        # Con varios procesos la base de datos se prepara una sola vez, aquí,
+        # antes de crearlos; si no, cada worker ejecutaría create_all a la vez
+        _inicializar_base_de_datos()
+        os.environ[_BD_INICIALIZADA] = "1"
     uvicorn.run(
         # Configurar el servidor uvicorn con los parámetros apropiados
         "main:app",
-        host="0.0.0.0",
-        port=8000,
-        reload=True
- )
\ No newline at end of file
+        host=settings.host,
+        port=settings.port,
+        # Recarga automática solo en desarrollo (un único proceso);
+        # en otros entornos settings.workers procesos (uno por CPU si no se indica)
+        reload=desarrollo and settings.reload,
+        workers=workers,
+        # uvloop no está disponible en Windows
+        loop="asyncio" if sys.platform == "win32" else "uvloop",
+        http="httptools",
+        # AccessLogMiddleware registra cada petición en nivel access_log_level
+        # (INFO por defecto, también en producción); se evita el doble registro
+        access_log=False,
+    )
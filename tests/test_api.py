@@ -3,14 +3,18 @@ Tests para la API de Películas.
 Pruebas unitarias y de integración usando pytest.
 """
 
+import logging
+
 import pytest
 from fastapi.testclient import TestClient
-from sqlmodel import Session, SQLModel, create_engine
+from sqlmodel import Session, SQLModel, create_engine, select
 from sqlmodel.pool import StaticPool
 
-from main import app
+from main import access_logger, app
+from app.config import ProductionSettings
 from app.database import get_session
-from app.models import Usuario, Pelicula, Favorito
+from app import models
+from app.models import Usuario, Pelicula, Favorito, Genero, PeliculaGenero
 
 
 # =============================================================================
@@ -92,6 +96,82 @@ def pelicula_test_fixture(session: Session):
     return pelicula
 
 
+# =============================================================================
+# TESTS GENERALES
+# =============================================================================
+
+class TestGenerales:
+    """Tests para los endpoints raíz y de health check."""
+    
+    # Test para endpoint raíz
+    def test_root(self, client: TestClient):
+        """Test para GET /"""
+        response = client.get("/")
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/json"
+        data = response.json()
+        assert data["message"] == "Bienvenido a la API de Películas"
+        assert data["endpoints_principales"]["usuarios"] == "/api/usuarios"
+    
+    # Test para el esquema OpenAPI y la documentación
+    def test_openapi_y_documentacion(self, client: TestClient):
+        """Test para GET /openapi.json, /docs y /redoc"""
+        response = client.get("/openapi.json")
+        assert response.status_code == 200
+        assert "/api/usuarios/" in response.json()["paths"]
+        assert client.get("/openapi.json").content == response.content
+        assert client.get("/docs").status_code == 200
+        assert client.get("/redoc").status_code == 200
+    
+    # Test para la documentación detrás de un proxy con prefijo
+    def test_documentacion_con_root_path(self):
+        """Test para verificar que /docs y /redoc respetan root_path"""
+        proxy = TestClient(app, root_path="/peliculas-api")
+        assert "/peliculas-api/openapi.json" in proxy.get("/docs").text
+        assert "/peliculas-api/openapi.json" in proxy.get("/redoc").text
+        assert proxy.get("/openapi.json").json()["servers"] == [{"url": "/peliculas-api"}]
+        assert "servers" not in TestClient(app).get("/openapi.json").json()
+        assert proxy.get("/docs/oauth2-redirect").status_code == 200
+    
+    # Test para el orden de los middlewares
+    def test_cors_envuelve_al_logger(self):
+        """Test para verificar que CORS es el middleware más externo"""
+        nombres = [m.cls.__name__ for m in app.user_middleware]
+        assert nombres.index("CORSMiddleware") < nombres.index("AccessLogMiddleware")
+    
+    # Test para el nivel del logger de accesos
+    def test_logger_de_accesos_independiente_de_log_level(self):
+        """Test para verificar que producción sigue registrando las peticiones"""
+        produccion = ProductionSettings()
+        assert produccion.log_level == "WARNING"
+        assert produccion.access_log_level == "INFO"
+        assert access_logger.isEnabledFor(logging.INFO)
+    
+    # Test para preflight CORS
+    def test_cors_preflight(self, client: TestClient):
+        """Test para verificar que el preflight CORS se puede cachear"""
+        response = client.options(
+            "/api/usuarios/",
+            headers={
+                "Origin": "http://localhost:3000",
+                "Access-Control-Request-Method": "POST",
+                "Access-Control-Request-Headers": "Content-Type",
+            },
+        )
+        assert response.status_code == 200
+        assert response.headers["access-control-max-age"] == "86400"
+    
+    # Test para health check
+    def test_health_check(self, client: TestClient):
+        """Test para GET /health"""
+        response = client.get("/health")
+        assert response.status_code == 200
+        data = response.json()
+        assert data["status"] == "healthy"
+        assert data["database"] == "connected"
+        assert "timestamp" in data
+
+
 # =============================================================================
 # TESTS DE USUARIOS
 # =============================================================================
@@ -107,6 +187,45 @@ class TestUsuarios:
         assert isinstance(response.json(), list)
         pass
     
+    # Test para paginar usuarios con cursor
+    def test_listar_usuarios_paginacion(self, client: TestClient, session: Session):
+        """Test para GET /api/usuarios con after_id y limit"""
+        for i in range(3):
+            session.add(Usuario(nombre=f"Usuario {i}", correo=f"usuario{i}@example.com"))
+        session.commit()
+
+        response = client.get("/api/usuarios/?limit=2")
+        assert response.status_code == 200
+        primera = response.json()
+        assert len(primera) == 2
+        cursor = response.headers["X-Next-Cursor"]
+        assert cursor == str(primera[-1]["id"])
+
+        response = client.get(f"/api/usuarios/?limit=2&after_id={cursor}")
+        segunda = response.json()
+        assert len(segunda) == 1
+        assert segunda[0]["id"] > primera[-1]["id"]
+        assert "X-Next-Cursor" not in response.headers
+    
+    # Test para el parámetro skip antiguo
+    def test_listar_usuarios_skip_rechazado(self, client: TestClient):
+        """Test para verificar que skip responde 422 en vez de ignorarse"""
+        response = client.get("/api/usuarios/?skip=10")
+        assert response.status_code == 422
+    
+    # Test para leer el cursor desde otro origen
+    def test_listar_usuarios_cursor_expuesto_por_cors(
+        self, client: TestClient, session: Session
+    ):
+        """Test para verificar que CORS expone X-Next-Cursor"""
+        session.add(Usuario(nombre="Usuario", correo="usuario@example.com"))
+        session.commit()
+        response = client.get(
+            "/api/usuarios/?limit=1", headers={"Origin": "http://localhost:3000"}
+        )
+        assert response.headers["X-Next-Cursor"]
+        assert "x-next-cursor" in response.headers["access-control-expose-headers"].lower()
+    
     # Test para crear usuario
     def test_crear_usuario(self, client: TestClient):
         """Test para POST /api/usuarios"""
@@ -160,6 +279,25 @@ class TestUsuarios:
         assert data["nombre"] == update_data["nombre"]
         pass
     
+    # Test para actualizar usuario con correo de otro usuario
+    def test_actualizar_usuario_correo_duplicado(
+        self, 
+        client: TestClient, 
+        session: Session,
+        usuario_test: Usuario
+    ):
+        """Test para verificar que no se puede actualizar a un correo ya registrado"""
+        otro = Usuario(nombre="Otro Usuario", correo="otro@example.com")
+        session.add(otro)
+        session.commit()
+        session.refresh(otro)
+
+        response = client.put(
+            f"/api/usuarios/{otro.id}", json={"correo": usuario_test.correo}
+        )
+        assert response.status_code == 400
+        assert "correo" in response.json()["detail"].lower()
+    
     # Test para eliminar usuario
     def test_eliminar_usuario(self, client: TestClient, usuario_test: Usuario):
         """Test para DELETE /api/usuarios/{id}"""
@@ -170,6 +308,25 @@ class TestUsuarios:
         response = client.get(f"/api/usuarios/{usuario_test.id}")
         assert response.status_code == 404
         pass
+    
+    # Test para eliminar usuario con favoritos
+    def test_eliminar_usuario_con_favoritos(
+        self, 
+        client: TestClient, 
+        session: Session,
+        usuario_test: Usuario, 
+        pelicula_test: Pelicula
+    ):
+        """Test para verificar que se eliminan los favoritos del usuario"""
+        favorito = Favorito(id_usuario=usuario_test.id, id_pelicula=pelicula_test.id)
+        session.add(favorito)
+        session.commit()
+
+        response = client.delete(f"/api/usuarios/{usuario_test.id}")
+        assert response.status_code == 204
+
+        response = client.get("/api/favoritos/")
+        assert response.json() == []
 
 
 # =============================================================================
@@ -226,6 +383,53 @@ class TestPeliculas:
         assert data["titulo"] == update_data["titulo"]
         pass
     
+    # Test para actualizar el género de una película
+    def test_actualizar_genero_pelicula(
+        self, 
+        client: TestClient, 
+        session: Session,
+        pelicula_test: Pelicula
+    ):
+        """Test para verificar que los géneros normalizados siguen a Pelicula.genero"""
+        response = client.put(
+            f"/api/peliculas/{pelicula_test.id}", json={"genero": "Comedia, Romance"}
+        )
+        assert response.status_code == 200
+        session.refresh(pelicula_test)
+        assert sorted(g.nombre for g in pelicula_test.generos) == ["Comedia", "Romance"]
+    
+    # Test para crear un género que otra petición acaba de insertar
+    def test_crear_pelicula_genero_concurrente(
+        self,
+        client: TestClient,
+        session: Session,
+        monkeypatch: pytest.MonkeyPatch
+    ):
+        """Test para verificar que el índice único de Genero.nombre no produce un 500"""
+        session.add(Genero(nombre="Drama"))
+        session.commit()
+        
+        # La primera búsqueda no ve el género, como si otra petición
+        # lo hubiera insertado justo después
+        buscar_generos = models._buscar_generos
+        llamadas = []
+        def buscar_sin_ver_el_primero(s, nombres):
+            llamadas.append(nombres)
+            return {} if len(llamadas) == 1 else buscar_generos(s, nombres)
+        monkeypatch.setattr(models, "_buscar_generos", buscar_sin_ver_el_primero)
+        
+        pelicula_data = {
+            "titulo": "Película Concurrente",
+            "director": "Director",
+            "genero": "Drama",
+            "duracion": 100,
+            "año": 2021,
+            "clasificacion": "PG"
+        }
+        response = client.post("/api/peliculas/", json=pelicula_data)
+        assert response.status_code == 201
+        assert len(session.exec(select(Genero)).all()) == 1
+    
     # Test para eliminar película
     def test_eliminar_pelicula(self, client: TestClient, pelicula_test: Pelicula):
         """Test para DELETE /api/peliculas/{id}"""
@@ -233,6 +437,29 @@ class TestPeliculas:
         assert response.status_code == 204
         pass
     
+    # Test para eliminar película y reutilizar su id con el mismo género
+    def test_eliminar_pelicula_limpia_generos(
+        self,
+        client: TestClient,
+        session: Session,
+        pelicula_test: Pelicula
+    ):
+        """Test para verificar que no quedan filas huérfanas en PeliculaGenero"""
+        response = client.delete(f"/api/peliculas/{pelicula_test.id}")
+        assert response.status_code == 204
+        assert session.exec(select(PeliculaGenero)).all() == []
+        
+        pelicula_data = {
+            "titulo": "Otra Película",
+            "director": "Otro Director",
+            "genero": "Drama",
+            "duracion": 100,
+            "año": 2021,
+            "clasificacion": "PG"
+        }
+        response = client.post("/api/peliculas/", json=pelicula_data)
+        assert response.status_code == 201
+    
     # Test para buscar películas
     def test_buscar_peliculas(self, client: TestClient, pelicula_test: Pelicula):
         """Test para GET /api/peliculas/buscar"""
@@ -338,6 +565,36 @@ class TestFavoritos:
         assert response.status_code == 201
         pass
     
+    # Test para marcar dos veces el mismo favorito desde usuario
+    def test_marcar_favorito_usuario_duplicado(
+        self, 
+        client: TestClient, 
+        usuario_test: Usuario, 
+        pelicula_test: Pelicula
+    ):
+        """Test para verificar que no se marca dos veces la misma película"""
+        url = f"/api/usuarios/{usuario_test.id}/favoritos/{pelicula_test.id}"
+        assert client.post(url).status_code == 201
+        response = client.post(url)
+        assert response.status_code == 400
+    
+    # Test para eliminar favorito desde usuario
+    def test_eliminar_favorito_usuario(
+        self, 
+        client: TestClient, 
+        usuario_test: Usuario, 
+        pelicula_test: Pelicula
+    ):
+        """Test para DELETE /api/usuarios/{id}/favoritos/{id_pelicula}"""
+        url = f"/api/usuarios/{usuario_test.id}/favoritos/{pelicula_test.id}"
+        client.post(url)
+        response = client.delete(url)
+        assert response.status_code == 204
+
+        # Eliminarlo de nuevo debe fallar porque ya no existe
+        response = client.delete(url)
+        assert response.status_code == 404
+    
     # Test para listar favoritos de usuario
     def test_listar_favoritos_usuario(
         self, 
@@ -358,6 +615,53 @@ class TestFavoritos:
         data = response.json()
         assert len(data) > 0
         pass
+    
+    # Test para listar favoritos de usuario sin favoritos
+    def test_listar_favoritos_usuario_vacio(self, client: TestClient, usuario_test: Usuario):
+        """Test para verificar lista vacía cuando el usuario no tiene favoritos"""
+        response = client.get(f"/api/usuarios/{usuario_test.id}/favoritos")
+        assert response.status_code == 200
+        assert response.json() == []
+    
+    # Test para listar favoritos de usuario inexistente
+    def test_listar_favoritos_usuario_no_existe(self, client: TestClient):
+        """Test para verificar error 404 con usuario inexistente"""
+        response = client.get("/api/usuarios/9999/favoritos")
+        assert response.status_code == 404
+
+    
+    # Test para estadísticas de usuario
+    def test_estadisticas_usuario(
+        self, 
+        client: TestClient, 
+        session: Session,
+        usuario_test: Usuario, 
+        pelicula_test: Pelicula
+    ):
+        """Test para GET /api/usuarios/{id}/estadisticas"""
+        otra = Pelicula(
+            titulo="Otra Película",
+            director="Director Test",
+            genero="Drama, Crimen",
+            duracion=95,
+            año=2021,
+            clasificacion="R"
+        )
+        session.add(otra)
+        session.commit()
+        session.refresh(otra)
+        session.add(Favorito(id_usuario=usuario_test.id, id_pelicula=pelicula_test.id))
+        session.add(Favorito(id_usuario=usuario_test.id, id_pelicula=otra.id))
+        session.commit()
+
+        response = client.get(f"/api/usuarios/{usuario_test.id}/estadisticas")
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total_peliculas_favoritas"] == 2
+        assert data["tiempo_total_minutos"] == 215
+        assert data["tiempo_total_formateado"] == "3h 35m"
+        assert data["generos_preferidos"][0] == {"genero": "Drama", "cantidad": 2}
+        assert {"genero": "Crimen", "cantidad": 1} in data["generos_preferidos"]
 
 
 # =============================================================================
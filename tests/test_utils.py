@@ -0,0 +1,90 @@
+"""
+Tests para las funciones de utilidad.
+"""
+
+from datetime import datetime
+
+from utils import (
+    formatear_duracion,
+    generar_slug,
+    obtener_año_actual,
+    validar_año,
+    validar_correo,
+)
+
+
+# =============================================================================
+# TESTS DE CORREOS
+# =============================================================================
+
+class TestValidarCorreo:
+    """Tests para validar_correo."""
+
+    def test_correo_valido(self):
+        """Test para un correo con formato válido"""
+        assert validar_correo("juan.perez@example.com")
+
+    def test_correo_invalido(self):
+        """Test para correos vacíos, sin arroba o demasiado largos"""
+        assert not validar_correo("")
+        assert not validar_correo("juan.example.com")
+        assert not validar_correo("a" * 250 + "@example.com")
+        assert not validar_correo("juan@example")
+
+
+# =============================================================================
+# TESTS DE SLUGS
+# =============================================================================
+
+class TestGenerarSlug:
+    """Tests para generar_slug."""
+
+    def test_slug_basico(self):
+        """Test para espacios, guion bajo, mayúsculas y signos"""
+        assert generar_slug("  Hola_Mundo  Cruel!! ") == "hola-mundo-cruel"
+
+    def test_slug_guiones_repetidos(self):
+        """Test para verificar que se colapsan los guiones"""
+        assert generar_slug("--Matrix -- Reloaded--") == "matrix-reloaded"
+
+    def test_slug_tildes(self):
+        """Test para verificar que se quitan las tildes"""
+        assert generar_slug("El Señor de los Anillos: Película") == "el-senor-de-los-anillos-pelicula"
+
+
+# =============================================================================
+# TESTS DE AÑOS
+# =============================================================================
+
+class TestAños:
+    """Tests para obtener_año_actual y validar_año."""
+
+    def test_año_actual(self):
+        """Test para verificar que el año en caché coincide con el real"""
+        assert obtener_año_actual() == datetime.now().year
+        assert obtener_año_actual() == datetime.now().year
+
+    def test_validar_año(self):
+        """Test para años válidos e inválidos"""
+        assert validar_año(2000)
+        assert not validar_año(1800)
+        assert not validar_año(datetime.now().year + 1)
+
+
+# =============================================================================
+# TESTS DE DURACIÓN
+# =============================================================================
+
+class TestFormatearDuracion:
+    """Tests para formatear_duracion."""
+
+    def test_duracion_en_tabla(self):
+        """Test para duraciones comunes de películas"""
+        assert formatear_duracion(0) == "00:00"
+        assert formatear_duracion(148) == "02:28"
+        assert formatear_duracion(600) == "10:00"
+
+    def test_duracion_fuera_de_tabla(self):
+        """Test para duraciones mayores a 600 minutos"""
+        assert formatear_duracion(601) == "10:01"
+        assert formatear_duracion(1500) == "25:00"
@@ -3,8 +3,26 @@ Módulo de utilidades para la aplicación.
 Contiene funciones auxiliares utilizadas en diferentes partes de la aplicación.
 """
 import re
+import string
+import time
+import unicodedata
 from datetime import datetime
 
+# Expresiones regulares compiladas una sola vez al importar el módulo
+_EMAIL_RE = re.compile(r'^[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+$')
+_DASH_RE = re.compile(r'[-]+')
+
+# Tabla para generar_slug: mayúsculas a minúsculas, espacios y guion bajo
+# a guion, y elimina cualquier otro carácter ASCII no alfanumérico
+_SLUG_TABLE = str.maketrans(
+    {
+        **{chr(c): None for c in range(128)},
+        **{c: c for c in string.ascii_lowercase + string.digits + '-'},
+        **{c: c.lower() for c in string.ascii_uppercase},
+        **{c: '-' for c in string.whitespace + '_'},
+    }
+)
+
 def validar_correo(correo):
     """
     Valida que un correo electrónico tenga un formato válido.
@@ -15,13 +33,27 @@ def validar_correo(correo):
     Returns:
         bool: True si el correo es válido, False en caso contrario
     """
-    # expresión regular para validar el correo
-    patron = r'^[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+$'
-    return bool(re.match(patron, correo))
+    # Descarta los casos obvios antes de ejecutar la expresión regular
+    if not correo or '@' not in correo or len(correo) > 254:
+        return False
+    return _EMAIL_RE.match(correo) is not None
+
+# Duraciones "HH:MM" precalculadas para 0 a 600 minutos
+_DURATION_LUT = tuple(f"{m // 60:02d}:{m % 60:02d}" for m in range(601))
 
 def formatear_duracion(minutos):
-    horas = minutos // 60
-    minutos_restantes = minutos % 60
+    """
+    Formatea una duración en minutos como "HH:MM".
+    
+    Args:
+        minutos (int): Duración en minutos
+        
+    Returns:
+        str: Duración formateada
+    """
+    if 0 <= minutos < len(_DURATION_LUT):
+        return _DURATION_LUT[minutos]
+    horas, minutos_restantes = divmod(minutos, 60)
     return f"{horas:02d}:{minutos_restantes:02d}"
 
 def generar_slug(texto):
@@ -35,27 +67,31 @@ def generar_slug(texto):
     Returns:
         str: Slug generado
     """
-    # Convertir a minúsculas
-    slug = texto.lower()
-    
-    # Reemplazar espacios con guiones
-    slug = re.sub(r'[\s_]+', '-', slug)
-    # Eliminar caracteres no alfanuméricos (excepto guiones)
-    slug = re.sub(r'[^a-z0-9-]', '', slug)
-    # Reemplazar múltiples guiones con uno solo
-    slug = re.sub(r'[-]+', '-', slug)
-    # Eliminar guiones al inicio y final
-    slug = slug.strip('-')
-    return slug
+    # Quitar tildes y caracteres no ASCII ("Película" -> "Pelicula")
+    if not texto.isascii():
+        texto = unicodedata.normalize('NFKD', texto).encode('ascii', 'ignore').decode()
+    # Minúsculas, espacios a guiones y eliminar el resto en una sola pasada
+    slug = texto.translate(_SLUG_TABLE)
+    # Reemplazar múltiples guiones con uno solo y quitarlos al inicio y final
+    return _DASH_RE.sub('-', slug).strip('-')
+
+# Caché del año actual: [momento de expiración (time.monotonic), año]
+_YEAR_CACHE = [0.0, 0]
+_YEAR_TTL = 3600.0  # segundos
 
 def obtener_año_actual():
     """
     Obtiene el año actual.
+    El valor se recalcula como máximo una vez por hora.
     
     Returns:
         int: Año actual
     """
-    return datetime.now().year
+    now = time.monotonic()
+    if now >= _YEAR_CACHE[0]:
+        _YEAR_CACHE[1] = datetime.now().year
+        _YEAR_CACHE[0] = now + _YEAR_TTL
+    return _YEAR_CACHE[1]
 
 def validar_año(año):
     """